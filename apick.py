@@ -3,19 +3,74 @@
 __version__ = "0.0.2"
 
 import argparse
+import atexit
+import contextlib
+import copy
+import functools
+import hashlib
 import json
+import mmap
 import os
+import re
+import shlex
+import shutil
 import subprocess
 import sys
 import tempfile
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
-from urllib.parse import urlencode, urlparse
+from typing import TYPE_CHECKING, Any
+from urllib.parse import quote, unquote, urlencode, urlparse
 
 import httpx
 import yaml
 
-HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".apick", "history.json")
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+try:
+    # The C loader is 10-20x faster on large specs
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import orjson
+except ImportError:  # stdlib json still works, just slower
+    orjson = None
+
+HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".apick", "history.jsonl")
 MAX_HISTORY = 500
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".apick", "cache")
+
+# Per-invocation cache for the spec being browsed. The CLI works on one spec
+# per process, so caching is scoped to the active spec — large specs reference
+# the same components many times and re-walking the pointer each time is waste.
+_active_spec: dict | None = None
+_ref_cache: dict[str, dict] = {}
+_schema_cache: dict[str | int, dict] = {}
+
+
+def _set_active_spec(spec: dict) -> None:
+    """Register the spec for this invocation and reset per-spec caches.
+
+    The components section is indexed up front by seeding the ref cache, so
+    even a first lookup of '#/components/<kind>/<name>' is one dict hit
+    instead of a pointer walk.
+    """
+    global _active_spec
+    _active_spec = spec
+    _ref_cache.clear()
+    _schema_cache.clear()
+    components = spec.get("components")
+    if isinstance(components, dict):
+        for kind, members in components.items():
+            if isinstance(members, dict):
+                for name, value in members.items():
+                    _ref_cache[f"#/components/{kind}/{name}"] = value
+
 
 FZF_COLOR = (
     "dark"
@@ -37,144 +92,500 @@ FZF_COLOR = (
     ",preview-border:#333333"
 )
 
+_PATH_PARAM_RE = re.compile(r"\{([^{}]+)\}")
 
-def highlight_json(text: str) -> str:
-    """Colorize JSON text via jq. Falls back to plain text if jq is unavailable."""
+METHOD_COLORS = {
+    "GET": "\033[32m",
+    "POST": "\033[33m",
+    "PUT": "\033[34m",
+    "PATCH": "\033[35m",
+    "DELETE": "\033[31m",
+}
+RESET = "\033[0m"
+
+# History rows use a fixed 7-char method column; pre-render the colored cell
+# for each known method so the format loop does one dict hit per row
+_METHOD_CELL = {m: f"{c}{m:7s}{RESET}" for m, c in METHOD_COLORS.items()}
+
+_http_client: httpx.Client | None = None
+
+
+def _client() -> httpx.Client:
+    """Shared HTTP client, created lazily and closed at exit.
+
+    Reusing one client keeps the connection pool (and TLS session) alive
+    across the spec fetch, the request itself, and history replays.
+    """
+    global _http_client
+    if _http_client is None:
+        try:
+            # HTTP/2 multiplexing when the optional h2 package is around
+            _http_client = httpx.Client(timeout=30, follow_redirects=True, http2=True)
+        except ImportError:  # httpx installed without the http2 extra
+            _http_client = httpx.Client(timeout=30, follow_redirects=True)
+        atexit.register(_http_client.close)
+    return _http_client
+
+
+def _json_dumps(obj: object, *, indent: bool = False) -> str:
+    """Serialize via orjson when installed, stdlib json otherwise."""
+    if orjson is not None:
+        if indent:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+        return orjson.dumps(obj).decode()
+    if indent:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def _json_loads(data: str | bytes) -> dict | list:
+    """Parse via orjson when installed, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@functools.lru_cache(maxsize=1)
+def _have_jq() -> bool:
+    return shutil.which("jq") is not None
+
+
+@functools.lru_cache(maxsize=1)
+def _pygments_tools() -> tuple | None:
+    """Import pygments once and reuse the lexer/formatter instances."""
     try:
-        result = subprocess.run(
-            ["jq", "-C", "."],
-            input=text,
-            capture_output=True,
-            text=True,
-        )
-        if result.returncode == 0:
-            return result.stdout
-    except FileNotFoundError:
-        pass
+        # Concrete modules rather than the lazy package-level re-exports,
+        # which type checkers can't resolve
+        from pygments import highlight
+        from pygments.formatters.terminal256 import Terminal256Formatter
+        from pygments.lexers.data import JsonLexer
+    except ImportError:
+        return None
+    return highlight, JsonLexer(), Terminal256Formatter()
+
+
+def _pygments_highlight(text: str) -> str | None:
+    """Colorize JSON in-process. Returns None if pygments is unavailable."""
+    tools = _pygments_tools()
+    if tools is None:
+        return None
+    highlight, lexer, formatter = tools
+    return highlight(text, lexer, formatter)
+
+
+def highlight_json(text: str) -> str:
+    """Colorize JSON text in-process via pygments, falling back to plain text.
+
+    Forking jq costs milliseconds per call — more than the highlighting work
+    itself on typical response bodies — so it's opt-in via APICK_USE_JQ.
+    """
+    if os.environ.get("APICK_USE_JQ") and _have_jq():
+        try:
+            result = subprocess.run(
+                ["jq", "-C", "."],
+                input=text,
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode == 0:
+                return result.stdout
+        except FileNotFoundError:
+            pass
+    colored = _pygments_highlight(text)
+    if colored is not None:
+        return colored
     return text
 
 
+def _cached_fetch(url: str) -> bytes:
+    """GET a spec URL through an on-disk ETag/Last-Modified cache.
+
+    When a cached copy exists, sends conditional headers and returns the
+    cached body on 304, so repeated runs skip the body transfer entirely.
+    Returns raw bytes so the JSON parser can skip a utf-8 decode round-trip.
+    """
+    key = hashlib.sha1(url.encode(), usedforsecurity=False).hexdigest()
+    body_path = os.path.join(CACHE_DIR, f"{key}.body")
+    meta_path = os.path.join(CACHE_DIR, f"{key}.meta")
+
+    headers = {}
+    have_cache = os.path.exists(body_path)
+    if have_cache:
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    resp = _client().get(url, headers=headers)
+    if resp.status_code == 304 and have_cache:
+        with open(body_path, "rb") as f:
+            return f.read()
+    resp.raise_for_status()
+
+    meta = {}
+    if resp.headers.get("etag"):
+        meta["etag"] = resp.headers["etag"]
+    if resp.headers.get("last-modified"):
+        meta["last_modified"] = resp.headers["last-modified"]
+    if meta:  # only cache bodies we can validate later
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(body_path, "wb") as f:
+            f.write(resp.content)
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+    return resp.content
+
+
 def fetch_spec(source: str) -> dict:
     """Fetch and parse an OpenAPI spec from a URL or local file."""
     if urlparse(source).scheme in ("http", "https"):
-        resp = httpx.get(source, timeout=30)
-        resp.raise_for_status()
-        content = resp.text
+        content = _cached_fetch(source)
     else:
-        with open(source) as f:
+        with open(source, "rb") as f:
             content = f.read()
 
-    # Try JSON first, fall back to YAML
-    try:
-        return json.loads(content)
-    except json.JSONDecodeError:
-        return yaml.safe_load(content)
+    # JSON documents start with '{' or '['; dispatching on that avoids
+    # running a doomed JSON parse over a multi-MB YAML spec first. Both
+    # parsers take bytes directly, skipping an up-front utf-8 decode.
+    spec = None
+    if content.lstrip()[:1] in (b"{", b"["):
+        # A parse failure here is e.g. a YAML flow mapping that isn't valid JSON
+        with contextlib.suppress(ValueError):
+            spec = _json_loads(content)
+    if spec is None:
+        spec = yaml.load(content, Loader=_YamlLoader)
+    if not isinstance(spec, dict):
+        print(f"\033[31mError: {source} is not an OpenAPI document\033[0m", file=sys.stderr)
+        sys.exit(1)
+    preresolve_spec(spec)
+    return spec
+
+
+@functools.lru_cache(maxsize=4096)
+def _split_ref(ref: str) -> tuple[str, ...]:
+    """Tokenize a local JSON pointer, once per distinct ref string.
+
+    Segments are percent-decoded and the JSON-pointer escapes ~1 ('/') and
+    ~0 ('~') are unfolded, per RFC 6901.
+    """
+    return tuple(
+        unquote(part).replace("~1", "/").replace("~0", "~")
+        for part in ref.removeprefix("#/").split("/")
+    )
 
 
 def resolve_ref(spec: dict, ref: str) -> dict:
-    """Resolve a $ref pointer like '#/components/schemas/Pet'."""
-    parts = ref.lstrip("#/").split("/")
+    """Resolve a $ref pointer like '#/components/schemas/Pet'.
+
+    Lookups against the active spec are cached by ref string, so repeated
+    references resolve with a single dict hit.
+    """
+    if spec is _active_spec and ref in _ref_cache:
+        return _ref_cache[ref]
     node = spec
-    for part in parts:
+    for part in _split_ref(ref):
         node = node[part]
+    if spec is _active_spec:
+        _ref_cache[ref] = node
     return node
 
 
+# Components referenced this many times or fewer get inlined at parse time
+_MAX_INLINE_USES = 5
+
+
+def _direct_refs(node: object) -> set[str]:
+    """Collect the $ref strings reachable directly from a node (no derefs).
+
+    Tracks visited container ids so self-containing structures (YAML aliases
+    can build them) terminate instead of looping.
+    """
+    found: set[str] = set()
+    stack = [node]
+    visited: set[int] = set()
+    while stack:
+        cur = stack.pop()
+        if id(cur) in visited or not isinstance(cur, dict | list):
+            continue
+        visited.add(id(cur))
+        if isinstance(cur, dict):
+            ref = cur.get("$ref")
+            if isinstance(ref, str):
+                found.add(ref)
+            else:
+                stack.extend(cur.values())
+        else:
+            stack.extend(cur)
+    return found
+
+
+def _recursive_refs(spec: dict, refs: set[str]) -> set[str]:
+    """Find refs that can reach themselves through the component graph.
+
+    Iterative gray/black DFS coloring; on a back edge the whole gray path is
+    marked, which over-approximates but only costs a skipped inline.
+    """
+    gray, black = 1, 2
+    color: dict[str, int] = {}
+    recursive: set[str] = set()
+    for start in refs:
+        if start in color:
+            continue
+        stack: list[tuple[str, Iterator[str] | None]] = [(start, None)]
+        while stack:
+            ref, children = stack[-1]
+            if children is None:
+                color[ref] = gray
+                try:
+                    target = resolve_ref(spec, ref)
+                except (KeyError, TypeError):
+                    target = None
+                children = iter(_direct_refs(target))
+                stack[-1] = (ref, children)
+            advanced = False
+            for child in children:
+                if color.get(child) == gray:
+                    recursive.add(child)
+                    recursive.update(r for r, _ in stack)
+                elif color.get(child) != black:
+                    stack.append((child, None))
+                    advanced = True
+                    break
+            if not advanced:
+                color[ref] = black
+                stack.pop()
+    return recursive
+
+
+def preresolve_spec(spec: dict) -> None:
+    """Inline rarely-used, non-recursive $refs into the spec in place.
+
+    For components referenced _MAX_INLINE_USES times or fewer, a one-time
+    deepcopy beats re-resolving the pointer on every access; shared and
+    recursive components stay behind resolve_ref's cache.
+    """
+    # Containers are dicts keyed by str or lists keyed by int; Any keeps the
+    # pairing out of the type checker's way
+    sites: list[tuple[Any, Any, str]] = []
+    counts: Counter[str] = Counter()
+    stack: list[dict | list] = [spec]
+    visited: set[int] = {id(spec)}  # guard against YAML-alias cycles
+    while stack:
+        node = stack.pop()
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        for key, child in items:
+            if isinstance(child, dict) and isinstance(child.get("$ref"), str):
+                sites.append((node, key, child["$ref"]))
+                counts[child["$ref"]] += 1
+            elif isinstance(child, dict | list) and id(child) not in visited:
+                visited.add(id(child))
+                stack.append(child)
+
+    recursive = _recursive_refs(spec, set(counts))
+    for container, key, ref in sites:
+        if counts[ref] > _MAX_INLINE_USES or ref in recursive:
+            continue
+        try:
+            target = resolve_ref(spec, ref)
+        except (KeyError, TypeError):
+            continue  # dangling ref — leave it for resolve_schema to surface
+        container[key] = copy.deepcopy(target)
+
+
 def resolve_schema(spec: dict, schema: dict) -> dict:
-    """Recursively resolve $ref in a schema."""
+    """Resolve $ref in a schema.
+
+    Walks the schema with an explicit worklist instead of recursion, so deep
+    schemas avoid per-node call overhead and self-referential schemas —
+    whether through a $ref chain or an in-memory YAML-alias cycle — resolve
+    the repeated node to {} instead of looping forever.
+    """
     if not isinstance(schema, dict):
         return schema
-    if "$ref" in schema:
-        schema = resolve_ref(spec, schema["$ref"])
-    result = {}
-    for k, v in schema.items():
-        if k == "properties" and isinstance(v, dict):
-            result[k] = {pk: resolve_schema(spec, pv) for pk, pv in v.items()}
-        elif k == "items" and isinstance(v, dict):
-            result[k] = resolve_schema(spec, v)
-        elif k == "allOf" and isinstance(v, list):
-            merged = {}
-            for item in v:
-                resolved = resolve_schema(spec, item)
-                merged.update(resolved)
-            return merged
-        else:
-            result[k] = v
-    return result
+    root: dict = {}
+    # Each task resolves a source node into dest[key]; "merge" tasks combine
+    # already-resolved allOf parts once their resolve tasks have run.
+    stack: list[tuple] = [("resolve", schema, root, "value", frozenset())]
+    while stack:
+        task = stack.pop()
+        if task[0] == "merge":
+            _, parts, dest, key = task
+            merged: dict = {}
+            for part in parts:
+                merged.update(part["value"])
+            dest[key] = merged
+            continue
+        _, src, dest, key, seen = task
+        if isinstance(src, dict) and "$ref" in src:
+            ref = src["$ref"]
+            if ref in seen:
+                dest[key] = {}  # recursive schema — cut the cycle
+                continue
+            seen = seen | {ref}
+            src = resolve_ref(spec, ref)
+        if not isinstance(src, dict):
+            dest[key] = src
+            continue
+        # Track node identity too: a YAML alias can close a cycle without
+        # any $ref on the path
+        if id(src) in seen:
+            dest[key] = {}
+            continue
+        seen = seen | {id(src)}
+        all_of = src.get("allOf")
+        if isinstance(all_of, list):
+            parts = [{"value": {}} for _ in all_of]
+            stack.append(("merge", parts, dest, key))
+            for part, item in zip(parts, all_of, strict=True):
+                stack.append(("resolve", item, part, "value", seen))
+            continue
+        result: dict = {}
+        for k, v in src.items():
+            if k == "properties" and isinstance(v, dict):
+                props: dict = {}
+                result[k] = props
+                for pk, pv in v.items():
+                    props[pk] = None  # placeholder keeps property order
+                    stack.append(("resolve", pv, props, pk, seen))
+            elif k == "items" and isinstance(v, dict):
+                result[k] = None
+                stack.append(("resolve", v, result, k, seen))
+            else:
+                result[k] = v
+        dest[key] = result
+    return root["value"]
 
 
-def extract_endpoints(spec: dict) -> list[dict]:
-    """Walk spec paths and build a flat list of endpoints."""
-    endpoints = []
+def _resolve_schema_cached(spec: dict, schema: dict) -> dict:
+    """resolve_schema with per-spec memoization.
+
+    Keyed by the $ref string when present (shared refs like Error/Pet are the
+    common case), falling back to the schema dict's id for inline schemas.
+    """
+    if spec is not _active_spec or not isinstance(schema, dict):
+        return resolve_schema(spec, schema)
+    key = schema.get("$ref") or id(schema)
+    cached = _schema_cache.get(key)
+    if cached is None:
+        cached = _schema_cache[key] = resolve_schema(spec, schema)
+    return cached
+
+
+@dataclass(slots=True)
+class Endpoint:
+    """One operation from the spec.
+
+    Slotted so specs with thousands of operations stay cheap — a slotted
+    instance is well under half the size of the dict it replaces. Field names
+    match the OpenAPI operation fields, and dict-style access is kept for
+    callers that still index records like the plain dicts they replaced.
+    """
+
+    method: str
+    path: str
+    summary: str = ""
+    description: str = ""
+    operationId: str = ""
+    parameters: list[dict] = field(default_factory=list)
+    requestBody: dict | None = None
+    responses: dict = field(default_factory=dict)
+
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+
+def _resolve_param(spec: dict, param: dict) -> dict:
+    """Resolve a parameter object that may be a $ref."""
+    if "$ref" in param:
+        return resolve_ref(spec, param["$ref"])
+    return param
+
+
+def _iter_endpoints(spec: dict):
+    """Yield endpoints lazily while walking spec paths."""
     for path, methods in spec.get("paths", {}).items():
-        # Collect path-level parameters
-        path_params = methods.get("parameters", [])
+        # Path-level parameters apply to every method; resolve and key them
+        # once here rather than once per method. Keys are (in, name) — the
+        # OpenAPI identity of a parameter
+        path_params = {
+            (p.get("in"), p.get("name")): p
+            for p in (_resolve_param(spec, raw) for raw in methods.get("parameters", []))
+        }
         for method in ("get", "post", "put", "patch", "delete", "head", "options"):
             if method not in methods:
                 continue
             operation = methods[method]
-            # Merge path-level and operation-level parameters
-            op_params = operation.get("parameters", [])
-            # Resolve any $ref parameters
-            resolved_params = []
-            for p in path_params + op_params:
-                if "$ref" in p:
-                    p = resolve_ref(spec, p["$ref"])
-                resolved_params.append(p)
-
-            endpoints.append(
-                {
-                    "method": method.upper(),
-                    "path": path,
-                    "summary": operation.get("summary", ""),
-                    "description": operation.get("description", ""),
-                    "operationId": operation.get("operationId", ""),
-                    "parameters": resolved_params,
-                    "requestBody": operation.get("requestBody"),
-                    "responses": operation.get("responses", {}),
-                }
+            op_params = {
+                (p.get("in"), p.get("name")): p
+                for p in (_resolve_param(spec, raw) for raw in operation.get("parameters", []))
+            }
+            # Dict union merges at C level; operation-level parameters
+            # override path-level ones, per the OpenAPI spec
+            merged = {**path_params, **op_params}
+
+            yield Endpoint(
+                method=method.upper(),
+                path=path,
+                summary=operation.get("summary", ""),
+                description=operation.get("description", ""),
+                operationId=operation.get("operationId", ""),
+                parameters=list(merged.values()),
+                requestBody=operation.get("requestBody"),
+                responses=operation.get("responses", {}),
             )
-    return endpoints
 
 
-def format_for_fzf(endpoints: list[dict]) -> str:
-    """Format endpoint list for fzf display."""
-    lines = []
-    max_method = max((len(ep["method"]) for ep in endpoints), default=6)
-    max_path = max((len(ep["path"]) for ep in endpoints), default=20)
+def extract_endpoints(spec: dict) -> list[Endpoint]:
+    """Walk spec paths and build a flat list of endpoints."""
+    return list(_iter_endpoints(spec))
+
+
+def _endpoint_lines(endpoints: list[Endpoint]):
+    """Yield one fzf row per endpoint."""
+    max_method = max_path = 0
+    for ep in endpoints:  # both column widths in a single pass
+        max_method = max(max_method, len(ep["method"]))
+        max_path = max(max_path, len(ep["path"]))
+    # Color + pad each distinct method once; the width depends on this
+    # endpoint list, so the cell cache is per call
+    cells: dict[str, str] = {}
     for i, ep in enumerate(endpoints):
-        method = ep["method"].ljust(max_method)
-        path = ep["path"].ljust(max_path)
-        summary = ep["summary"]
-        # Color the method
-        colors = {
-            "GET": "\033[32m",
-            "POST": "\033[33m",
-            "PUT": "\033[34m",
-            "PATCH": "\033[35m",
-            "DELETE": "\033[31m",
-        }
-        color = colors.get(ep["method"], "\033[0m")
-        reset = "\033[0m"
-        lines.append(f"{i:04d}\t{color}{method}{reset} {path} {summary}")
-    return "\n".join(lines)
+        method = ep["method"]
+        cell = cells.get(method)
+        if cell is None:
+            color = METHOD_COLORS.get(method, RESET)
+            cell = cells[method] = f"{color}{method:<{max_method}}{RESET}"
+        yield f"{i:04d}\t{cell} {ep['path']:<{max_path}} {ep['summary']}"
+
+
+def format_for_fzf(endpoints: list[Endpoint]) -> str:
+    """Format endpoint list for fzf display."""
+    return "\n".join(_endpoint_lines(endpoints))
 
 
-def endpoint_detail(spec: dict, ep: dict) -> str:
+def endpoint_detail(spec: dict, ep: Endpoint) -> str:
     """Format detail string for fzf preview pane."""
     dim = "\033[2m"
     reset = "\033[0m"
     sep = f"{dim}{'─' * 40}{reset}"
     lines = [""]
-    lines.append(f"\033[1m{ep['method']} {ep['path']}\033[0m")
-    if ep["summary"]:
-        lines.append(f"  {ep['summary']}")
-    if ep["description"]:
-        lines.append(f"\n  {ep['description']}")
+    lines.append(f"\033[1m{ep.method} {ep.path}\033[0m")
+    if ep.summary:
+        lines.append(f"  {ep.summary}")
+    if ep.description:
+        lines.append(f"\n  {ep.description}")
     lines.append("")
 
     # Parameters
-    params = ep.get("parameters", [])
+    params = ep.parameters
     if params:
         lines.append(sep)
         lines.append("\033[1mParameters:\033[0m")
@@ -189,7 +600,7 @@ def endpoint_detail(spec: dict, ep: dict) -> str:
         lines.append("")
 
     # Request body
-    rb = ep.get("requestBody")
+    rb = ep.requestBody
     if rb:
         lines.append(sep)
         lines.append("\033[1mRequest Body:\033[0m")
@@ -197,67 +608,86 @@ def endpoint_detail(spec: dict, ep: dict) -> str:
         for media, media_obj in content.items():
             lines.append(f"  Content-Type: {media}")
             schema = media_obj.get("schema", {})
-            resolved = resolve_schema(spec, schema)
+            resolved = _resolve_schema_cached(spec, schema)
             lines.append("  Schema:")
             lines.append(format_schema_tree(resolved, indent=4))
         lines.append("")
 
     # Responses
-    if ep.get("responses"):
+    if ep.responses:
         lines.append(sep)
         lines.append("\033[1mResponses:\033[0m")
-        for code, resp in ep["responses"].items():
+        for code, resp in ep.responses.items():
             desc = resp.get("description", "") if isinstance(resp, dict) else ""
             lines.append(f"  \033[33m{code}\033[0m {desc}")
             if isinstance(resp, dict):
                 content = resp.get("content", {})
                 for media_obj in content.values():
                     schema = media_obj.get("schema", {})
-                    resolved = resolve_schema(spec, schema)
+                    resolved = _resolve_schema_cached(spec, schema)
                     lines.append(format_schema_tree(resolved, indent=4))
 
     return "\n".join(lines)
 
 
 def format_schema_tree(schema: dict, indent: int = 0) -> str:
-    """Format a JSON schema as a readable tree."""
-    if not isinstance(schema, dict):
-        return " " * indent + str(schema)
-    lines = []
-    pad = " " * indent
-    stype = schema.get("type", "object")
-
-    if stype == "object":
-        props = schema.get("properties", {})
-        required = set(schema.get("required", []))
-        if not props:
-            lines.append(f"{pad}{{object}}")
-        for name, prop in props.items():
-            req = "*" if name in required else " "
-            ptype = prop.get("type", "object")
-            desc = prop.get("description", "")
-            if ptype == "object" and prop.get("properties"):
-                lines.append(f"{pad}{req} {name}: {{")
-                lines.append(format_schema_tree(prop, indent + 4))
-                lines.append(f"{pad}  }}")
-            elif ptype == "array":
-                items = prop.get("items", {})
-                items_type = items.get("type", "object")
-                lines.append(f"{pad}{req} {name}: [{items_type}]")
-                if items.get("properties"):
-                    lines.append(format_schema_tree(items, indent + 4))
-            else:
-                extra = f"  -- {desc}" if desc else ""
-                lines.append(f"{pad}{req} {name}: {ptype}{extra}")
-    elif stype == "array":
-        items = schema.get("items", {})
-        lines.append(f"{pad}[array of {items.get('type', 'object')}]")
-        if items.get("properties"):
-            lines.append(format_schema_tree(items, indent + 2))
-    else:
-        lines.append(f"{pad}{stype}")
+    """Format a JSON schema as a readable tree.
 
-    return "\n".join(lines)
+    Driven by an explicit worklist rather than recursion; schemas that
+    reference themselves render a <recursive> marker instead of looping.
+    """
+    out: list[str] = []
+    # Stack entries are either finished lines (str) or (schema, indent, seen)
+    # tuples still to be rendered
+    stack: list[str | tuple] = [(schema, indent, frozenset())]
+    while stack:
+        task = stack.pop()
+        if isinstance(task, str):
+            out.append(task)
+            continue
+        node, ind, seen = task
+        pad = " " * ind
+        if not isinstance(node, dict):
+            out.append(pad + str(node))
+            continue
+        if id(node) in seen:
+            out.append(f"{pad}<recursive>")
+            continue
+        seen = seen | {id(node)}
+        stype = node.get("type", "object")
+        # Children are collected in display order, then pushed reversed so
+        # the LIFO stack pops them in order
+        pending: list[str | tuple] = []
+        if stype == "object":
+            props = node.get("properties", {})
+            required = set(node.get("required", []))
+            if not props:
+                pending.append(f"{pad}{{object}}")
+            for name, prop in props.items():
+                req = "*" if name in required else " "
+                ptype = prop.get("type", "object")
+                desc = prop.get("description", "")
+                if ptype == "object" and prop.get("properties"):
+                    pending.append(f"{pad}{req} {name}: {{")
+                    pending.append((prop, ind + 4, seen))
+                    pending.append(f"{pad}  }}")
+                elif ptype == "array":
+                    items = prop.get("items", {})
+                    pending.append(f"{pad}{req} {name}: [{items.get('type', 'object')}]")
+                    if items.get("properties"):
+                        pending.append((items, ind + 4, seen))
+                else:
+                    extra = f"  -- {desc}" if desc else ""
+                    pending.append(f"{pad}{req} {name}: {ptype}{extra}")
+        elif stype == "array":
+            items = node.get("items", {})
+            pending.append(f"{pad}[array of {items.get('type', 'object')}]")
+            if items.get("properties"):
+                pending.append((items, ind + 2, seen))
+        else:
+            pending.append(f"{pad}{stype}")
+        stack.extend(reversed(pending))
+    return "\n".join(out)
 
 
 def _fzf_base_args(border_label: str, ghost: str, header: str) -> list[str]:
@@ -300,23 +730,70 @@ def _fzf_base_args(border_label: str, ghost: str, header: str) -> list[str]:
     ]
 
 
-def pick_endpoint(endpoints: list[dict], spec: dict, script_path: str) -> dict | None:
-    """Shell out to fzf and return the selected endpoint."""
-    fzf_input = format_for_fzf(endpoints)
+def _run_fzf(fzf_args: list[str], lines) -> str | None:
+    """Stream lines to fzf and return the selected line, or None on cancel.
+
+    Rows are written to fzf's stdin as they're generated, so fzf can start
+    filtering before the whole input is materialized in memory.
+    """
+    try:
+        proc = subprocess.Popen(fzf_args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    except FileNotFoundError:
+        print("\033[31mError: fzf not found. Install it: brew install fzf\033[0m", file=sys.stderr)
+        sys.exit(1)
+
+    assert proc.stdin is not None  # noqa: S101 — narrowing for ty
+    assert proc.stdout is not None  # noqa: S101 — narrowing for ty
+    try:
+        for line in lines:
+            proc.stdin.write(line + "\n")
+        proc.stdin.close()
+    except BrokenPipeError:  # user quit fzf before the input finished
+        pass
+    stdout = proc.stdout.read()
+    proc.wait()
+    if proc.returncode != 0:
+        return None  # User cancelled
+    return stdout.strip() or None
+
+
+def _write_preview_files(details: list[str]) -> tuple[str, str]:
+    """Write pre-rendered detail blocks plus a uint64 offset table.
 
-    # Write spec to temp file to avoid command line length limits
-    with tempfile.NamedTemporaryFile(
-        mode="w", suffix=".json", prefix="apick_spec_", delete=False
-    ) as spec_file:
-        json.dump(spec, spec_file)
-        spec_file_name = spec_file.name
+    Returns (blob_path, index_path). Entry i spans offsets[i]..offsets[i+1]
+    in the blob, so the preview subprocess can mmap and slice out one block
+    without parsing anything.
+    """
+    offsets = array("Q", [0])
+    fd, blob_path = tempfile.mkstemp(suffix=".bin", prefix="apick_details_")
+    with os.fdopen(fd, "wb") as f:
+        for detail in details:
+            f.write(detail.encode())
+            offsets.append(f.tell())
+    fd, index_path = tempfile.mkstemp(suffix=".idx", prefix="apick_details_")
+    with os.fdopen(fd, "wb") as f:
+        offsets.tofile(f)
+    return blob_path, index_path
+
+
+def pick_endpoint(endpoints: list[Endpoint], spec: dict, script_path: str) -> Endpoint | None:
+    """Shell out to fzf and return the selected endpoint.
+
+    Every detail block is rendered up front and handed to the preview
+    subprocess as a byte-range file, so a preview keystroke costs one mmap
+    slice instead of re-parsing the spec.
+    """
+    details_file, details_index = _write_preview_files(
+        [endpoint_detail(spec, ep) for ep in endpoints]
+    )
 
     api_title = spec.get("info", {}).get("title")
     border_label = f" apick — {api_title} " if api_title else " apick "
 
     try:
         preview_cmd = (
-            f"{sys.executable} {script_path} --_preview {{1}} --_spec-file {spec_file_name}"
+            f"{sys.executable} {script_path} --_preview {{1}}"
+            f" --_details-file {details_file} --_details-index {details_index}"
         )
         fzf_args = [
             *_fzf_base_args(
@@ -333,35 +810,21 @@ def pick_endpoint(endpoints: list[dict], spec: dict, script_path: str) -> dict |
             "--preview-label-pos",
             "2",
         ]
-        try:
-            result = subprocess.run(
-                fzf_args,
-                input=fzf_input,
-                capture_output=True,
-                text=True,
-            )
-        except FileNotFoundError:
-            print(
-                "\033[31mError: fzf not found. Install it: brew install fzf\033[0m", file=sys.stderr
-            )
-            sys.exit(1)
+        line = _run_fzf(fzf_args, _endpoint_lines(endpoints))
     finally:
-        os.unlink(spec_file_name)
-
-    if result.returncode != 0:
-        return None  # User cancelled
+        os.unlink(details_file)
+        os.unlink(details_index)
 
-    line = result.stdout.strip()
-    if not line:
+    if line is None:
         return None
     idx = int(line.split()[0])
     return endpoints[idx]
 
 
-def collect_params(spec: dict, ep: dict) -> dict:
+def collect_params(spec: dict, ep: Endpoint) -> dict:
     """Prompt for path/query/header params and request body."""
     collected = {"path": {}, "query": {}, "header": {}, "body": None}
-    params = ep.get("parameters", [])
+    params = ep.parameters
 
     for p in params:
         location = p.get("in", "query")
@@ -407,13 +870,15 @@ def collect_params(spec: dict, ep: dict) -> dict:
                 collected["header"][name] = val
 
     # Request body
-    rb = ep.get("requestBody")
+    rb = ep.requestBody
     if rb:
         content = rb.get("content", {})
         json_content = content.get("application/json")
         if json_content:
             schema = json_content.get("schema", {})
-            resolved = resolve_schema(spec, schema)
+            # Shares the cache with the preview render, so the schema the
+            # user just looked at is not resolved a second time
+            resolved = _resolve_schema_cached(spec, schema)
             template = generate_template(resolved)
             body_json = edit_body(template)
             if body_json is not None:
@@ -422,29 +887,50 @@ def collect_params(spec: dict, ep: dict) -> dict:
     return collected
 
 
+# Placeholder values for primitive schema types, used when a schema carries
+# no example, default, or enum
+_TYPE_PLACEHOLDERS = {"integer": 0, "number": 0.0, "boolean": False, "string": ""}
+
+
 def generate_template(schema: dict) -> dict | list | str:
-    """Generate a JSON template with placeholder values from a schema."""
-    stype = schema.get("type", "object")
-    if stype == "object":
-        props = schema.get("properties", {})
-        obj = {}
-        for name, prop in props.items():
-            obj[name] = generate_template(prop)
-        return obj
-    if stype == "array":
-        items = schema.get("items", {})
-        return [generate_template(items)]
-    if stype == "integer":
-        return schema.get("example", schema.get("default", 0))
-    if stype == "number":
-        return schema.get("example", schema.get("default", 0.0))
-    if stype == "boolean":
-        return schema.get("example", schema.get("default", False))
-    if stype == "string":
-        if schema.get("enum"):
-            return schema["enum"][0]
-        return schema.get("example", schema.get("default", ""))
-    return ""
+    """Generate a JSON template with placeholder values from a schema.
+
+    Uses an explicit assignment stack instead of recursion so deeply nested
+    (or self-referential) schemas cannot exhaust the interpreter stack.
+    """
+    root: dict = {}
+    # Each entry assigns the template for `node` into container[key]; the
+    # container is a dict with a str key or a list with an int index, which
+    # a union annotation can't correlate — hence Any
+    stack: list[tuple[Any, Any, dict, frozenset]] = [(root, "value", schema, frozenset())]
+    while stack:
+        container, key, node, seen = stack.pop()
+        if id(node) in seen:
+            container[key] = {}  # recursive schema — stop expanding
+            continue
+        stype = node.get("type", "object")
+        if stype == "object":
+            obj: dict = {}
+            container[key] = obj
+            seen = seen | {id(node)}
+            props = node.get("properties", {})
+            pending = []
+            for name, prop in props.items():
+                obj[name] = None  # placeholder keeps declaration order
+                pending.append((obj, name, prop, seen))
+            stack.extend(reversed(pending))
+        elif stype == "array":
+            lst: list = [None]
+            container[key] = lst
+            stack.append((lst, 0, node.get("items", {}), seen | {id(node)}))
+        elif stype in _TYPE_PLACEHOLDERS:
+            if stype == "string" and node.get("enum"):
+                container[key] = node["enum"][0]
+            else:
+                container[key] = node.get("example", node.get("default", _TYPE_PLACEHOLDERS[stype]))
+        else:
+            container[key] = ""
+    return root["value"]
 
 
 def edit_body(template: object) -> object | None:
@@ -467,16 +953,32 @@ def edit_body(template: object) -> object | None:
         os.unlink(tmpfile)
 
 
-def get_base_url(spec: dict, spec_source: str, override: str | None = None) -> str:
-    """Extract base URL from spec or use override.
+def fill_path(path: str, values: dict[str, str]) -> str:
+    """Substitute {param} placeholders in one pass, URL-encoding the values.
 
-    Handles relative server URLs by combining with the spec source URL.
+    Placeholders without a collected value are left untouched.
+    """
+
+    def replace(match: re.Match) -> str:
+        name = match.group(1)
+        if name in values:
+            return quote(values[name], safe="")
+        return match.group(0)
+
+    return _PATH_PARAM_RE.sub(replace, path)
+
+
+@functools.lru_cache(maxsize=64)
+def _compute_base_url(server_url: str | None, spec_source: str, override: str | None) -> str:
+    """Derive the base URL from its string inputs; memoized by value.
+
+    Keying on the strings rather than id(spec) keeps the cache valid even
+    when a garbage-collected spec's id gets reused.
     """
     if override:
         return override.rstrip("/")
-    servers = spec.get("servers", [])
-    if servers:
-        server_url = servers[0]["url"].rstrip("/")
+    if server_url is not None:
+        server_url = server_url.rstrip("/")
         parsed = urlparse(server_url)
         if parsed.scheme:
             return server_url
@@ -488,21 +990,45 @@ def get_base_url(spec: dict, spec_source: str, override: str | None = None) -> s
     return ""
 
 
+def get_base_url(spec: dict, spec_source: str, override: str | None = None) -> str:
+    """Extract base URL from spec or use override.
+
+    Handles relative server URLs by combining with the spec source URL.
+    """
+    server_url = None
+    if not override:  # an override wins outright; don't touch the spec for it
+        servers = spec.get("servers", [])
+        server_url = servers[0]["url"] if servers else None
+    return _compute_base_url(server_url, spec_source, override)
+
+
+# Constant for every JSON request; quote it once at import
+_JSON_CONTENT_TYPE = shlex.quote("Content-Type: application/json")
+
+
 def build_curl(
     method: str,
     url: str,
     headers: dict[str, str],
     body: object | None = None,
+    body_json: str | None = None,
 ) -> str:
-    """Build equivalent curl command string."""
+    """Build equivalent curl command string.
+
+    Callers that already serialized the body can pass it as body_json to
+    skip a second encode. Headers and body are shell-quoted via shlex, so
+    values containing quotes can't break the command.
+    """
     parts = ["curl", "-s"]
     if method != "GET":
         parts.extend(["-X", method])
     for k, v in headers.items():
-        parts.extend(["-H", f"'{k}: {v}'"])
+        parts.extend(["-H", shlex.quote(f"{k}: {v}")])
     if body is not None:
-        parts.extend(["-H", "'Content-Type: application/json'"])
-        parts.extend(["-d", f"'{json.dumps(body)}'"])
+        parts.extend(["-H", _JSON_CONTENT_TYPE])
+        if body_json is None:
+            body_json = _json_dumps(body)
+        parts.extend(["-d", shlex.quote(body_json)])
     parts.append(f'"{url}"')
     return " ".join(parts)
 
@@ -514,11 +1040,11 @@ def execute_request(
     body: object | None = None,
 ) -> int:
     """Make the HTTP request and print results. Returns HTTP status code."""
-    kwargs: dict = {"headers": headers, "timeout": 30}
+    kwargs: dict = {"headers": headers}
     if body is not None:
         kwargs["json"] = body
 
-    resp = httpx.request(method, url, **kwargs)
+    resp = _client().request(method, url, **kwargs)
 
     # Status line
     color = "\033[32m" if resp.status_code < 400 else "\033[31m"
@@ -526,7 +1052,7 @@ def execute_request(
 
     # Response body
     try:
-        formatted = json.dumps(resp.json(), indent=2)
+        formatted = _json_dumps(resp.json(), indent=True)
         print(highlight_json(formatted))
     except Exception:
         print(resp.text)
@@ -534,95 +1060,140 @@ def execute_request(
     return resp.status_code
 
 
+def _migrate_legacy_history() -> None:
+    """Convert a pre-JSONL history.json array file to the JSONL layout.
+
+    Runs only when the JSONL file doesn't exist yet; the legacy file is
+    removed after a successful rewrite so the upgrade happens once.
+    """
+    legacy = HISTORY_FILE.removesuffix(".jsonl") + ".json"
+    if os.path.exists(HISTORY_FILE) or not os.path.exists(legacy):
+        return
+    try:
+        with open(legacy) as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return
+    if isinstance(entries, list) and all(isinstance(e, dict) for e in entries):
+        save_history(entries)
+        with contextlib.suppress(OSError):
+            os.remove(legacy)
+
+
 def load_history() -> list[dict]:
-    """Read history file. Returns [] on any error."""
+    """Read history file (one JSON entry per line). Returns [] on any error."""
+    _migrate_legacy_history()
     try:
         with open(HISTORY_FILE) as f:
-            data = json.load(f)
-        if not isinstance(data, list):
-            return []
-        return data
-    except (FileNotFoundError, json.JSONDecodeError, OSError):
+            entries = [_json_loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):  # orjson and stdlib decode errors are ValueErrors
         return []
+    dict_entries = [e for e in entries if isinstance(e, dict)]
+    if len(dict_entries) != len(entries):  # some line held a non-object value
+        return []
+    return dict_entries[-MAX_HISTORY:]
 
 
 def save_history(entries: list[dict]) -> None:
-    """Write entries to disk, truncating to MAX_HISTORY."""
+    """Replace the history file with entries, truncating to MAX_HISTORY."""
     os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
-    entries = entries[-MAX_HISTORY:]
     with open(HISTORY_FILE, "w") as f:
-        json.dump(entries, f, indent=2)
+        f.writelines(_json_dumps(e) + "\n" for e in entries[-MAX_HISTORY:])
 
 
-def format_history_for_fzf(entries: list[dict]) -> str:
-    """Format history entries for fzf display, newest first."""
-    colors = {
-        "GET": "\033[32m",
-        "POST": "\033[33m",
-        "PUT": "\033[34m",
-        "PATCH": "\033[35m",
-        "DELETE": "\033[31m",
-    }
-    reset = "\033[0m"
-    lines = []
-    reversed_entries = list(reversed(entries))
-    for i, entry in enumerate(reversed_entries):
-        real_idx = len(entries) - 1 - i
+def append_history(entry: dict) -> None:
+    """Append one entry — O(1) per request instead of rewriting the file."""
+    _migrate_legacy_history()
+    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+    with open(HISTORY_FILE, "a") as f:
+        f.write(_json_dumps(entry) + "\n")
+    _maybe_compact_history()
+
+
+# Compact once the file holds this many lines; a line is at least 3 bytes
+# ("{}\n"), so smaller files are ruled out by a stat alone
+_COMPACT_LINES = MAX_HISTORY + 100
+_MIN_LINE_BYTES = 3
+
+
+def _maybe_compact_history() -> None:
+    """Trim the history file back to MAX_HISTORY once it has grown well past it.
+
+    The hot path is a single os.stat: files too small to hold _COMPACT_LINES
+    entries skip the line-count read entirely. The rewrite goes through a
+    temp file + os.replace so a crash mid-compaction can't lose history.
+    """
+    try:
+        if os.stat(HISTORY_FILE).st_size < _COMPACT_LINES * _MIN_LINE_BYTES:
+            return
+        with open(HISTORY_FILE) as f:
+            lines = f.readlines()
+    except OSError:
+        return
+    if len(lines) <= _COMPACT_LINES:
+        return
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(HISTORY_FILE), prefix="history-", suffix=".jsonl"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.writelines(lines[-MAX_HISTORY:])
+        os.replace(tmp_path, HISTORY_FILE)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+
+
+def _history_lines(entries: list[dict]):
+    """Yield one fzf row per history entry, newest first.
+
+    History is append-ordered, so newest-first is just the reverse iterator —
+    no timestamp sort needed.
+    """
+    for real_idx, entry in zip(range(len(entries) - 1, -1, -1), reversed(entries), strict=True):
         method = entry.get("method", "?")
-        color = colors.get(method, reset)
+        cell = _METHOD_CELL.get(method) or f"{RESET}{method:7s}{RESET}"
         ts = entry.get("timestamp", "")[:16]
         status = entry.get("status_code")
         status_str = "err" if status is None else str(status)
         url = entry.get("url", "")
         summary = entry.get("summary", "")
-        lines.append(
-            f"{real_idx:04d}\t{ts}  {color}{method:7s}{reset} [{status_str:>3s}] {url}  {summary}"
-        )
-    return "\n".join(lines)
+        yield f"{real_idx:04d}\t{ts}  {cell} [{status_str:>3s}] {url}  {summary}"
 
 
-def pick_history_entry(entries: list[dict]) -> dict | None:
-    """Open fzf over history entries and return the selected one."""
-    fzf_input = format_history_for_fzf(entries)
-    try:
-        fzf_args = [
-            *_fzf_base_args(
-                border_label=" apick history ",
-                ghost="type to filter history...",
-                header=" ↑↓ navigate  enter replay  esc quit",
-            ),
-            "--preview",
-            "echo {2..}",
-            "--preview-window",
-            "down:3:wrap:border-top",
-            "--preview-label",
-            " request ",
-            "--preview-label-pos",
-            "2",
-        ]
-        result = subprocess.run(
-            fzf_args,
-            input=fzf_input,
-            capture_output=True,
-            text=True,
-        )
-    except FileNotFoundError:
-        print(
-            "\033[31mError: fzf not found. Install it: brew install fzf\033[0m",
-            file=sys.stderr,
-        )
-        sys.exit(1)
+def format_history_for_fzf(entries: list[dict]) -> str:
+    """Format history entries for fzf display, newest first."""
+    return "\n".join(_history_lines(entries))
 
-    if result.returncode != 0:
-        return None
 
-    line = result.stdout.strip()
-    if not line:
+def pick_history_entry(entries: list[dict]) -> dict | None:
+    """Open fzf over history entries and return the selected one."""
+    fzf_args = [
+        *_fzf_base_args(
+            border_label=" apick history ",
+            ghost="type to filter history...",
+            header=" ↑↓ navigate  enter replay  esc quit",
+        ),
+        "--preview",
+        "echo {2..}",
+        "--preview-window",
+        "down:3:wrap:border-top",
+        "--preview-label",
+        " request ",
+        "--preview-label-pos",
+        "2",
+    ]
+    line = _run_fzf(fzf_args, _history_lines(entries))
+    if line is None:
         return None
     idx = int(line.split()[0])
     return entries[idx]
 
 
+# Headers that carry credentials and must never be written to history
+_SENSITIVE_HEADERS = frozenset({"authorization", "proxy-authorization", "cookie", "x-api-key"})
+
+
 def _save_to_history(
     method: str,
     url: str,
@@ -632,8 +1203,8 @@ def _save_to_history(
     summary: str,
     status_code: int | None,
 ) -> None:
-    """Append one entry to history, stripping Authorization header."""
-    safe_headers = {k: v for k, v in headers.items() if k.lower() != "authorization"}
+    """Append one entry to history, stripping credential headers."""
+    safe_headers = {k: v for k, v in headers.items() if k.lower() not in _SENSITIVE_HEADERS}
     entry = {
         "method": method,
         "url": url,
@@ -644,16 +1215,26 @@ def _save_to_history(
         "summary": summary,
         "status_code": status_code,
     }
-    entries = load_history()
-    entries.append(entry)
-    save_history(entries)
+    append_history(entry)
+
 
+def handle_preview(index: str, details_file: str, index_file: str) -> None:
+    """Handle --_preview mode: print one pre-rendered detail block.
 
-def handle_preview(index: str, spec: dict, endpoints: list[dict]) -> None:
-    """Handle --_preview mode: print endpoint details for fzf preview pane."""
+    The blocks were rendered by pick_endpoint; all that happens per
+    keystroke is an offset lookup and a byte-range read.
+    """
     idx = int(index)
-    if 0 <= idx < len(endpoints):
-        print(endpoint_detail(spec, endpoints[idx]))
+    offsets = array("Q")
+    with open(index_file, "rb") as f:
+        offsets.frombytes(f.read())
+    if not 0 <= idx < len(offsets) - 1:
+        return
+    start, end = offsets[idx], offsets[idx + 1]
+    if start == end:
+        return
+    with open(details_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        print(mm[start:end].decode())
 
 
 def main():
@@ -670,18 +1251,16 @@ def main():
 
     # Internal flags for fzf preview
     parser.add_argument("--_preview", help=argparse.SUPPRESS)
-    parser.add_argument("--_spec-file", help=argparse.SUPPRESS)
+    parser.add_argument("--_details-file", help=argparse.SUPPRESS)
+    parser.add_argument("--_details-index", help=argparse.SUPPRESS)
 
     args = parser.parse_args()
 
     # Handle preview mode (called by fzf)
     if args._preview is not None:
-        if args._spec_file is None:
+        if args._details_file is None or args._details_index is None:
             sys.exit(1)
-        with open(args._spec_file) as f:
-            spec = json.load(f)
-        endpoints = extract_endpoints(spec)
-        handle_preview(args._preview, spec, endpoints)
+        handle_preview(args._preview, args._details_file, args._details_index)
         sys.exit(0)
 
     if args.history:
@@ -721,6 +1300,7 @@ def main():
     except Exception as e:
         print(f"\033[31mFailed to load spec: {e}\033[0m", file=sys.stderr)
         sys.exit(1)
+    _set_active_spec(spec)
 
     # Extract endpoints
     endpoints = extract_endpoints(spec)
@@ -734,19 +1314,16 @@ def main():
         sys.exit(0)  # User cancelled
     assert ep is not None  # noqa: S101 — narrowing for ty
 
-    print(f"\n\033[1m{ep['method']} {ep['path']}\033[0m")
-    if ep["summary"]:
-        print(f"  {ep['summary']}\n")
+    print(f"\n\033[1m{ep.method} {ep.path}\033[0m")
+    if ep.summary:
+        print(f"  {ep.summary}\n")
 
     # Collect parameters
     collected = collect_params(spec, ep)
 
     # Build URL
     base_url = get_base_url(spec, args.spec, args.base_url)
-    path = ep["path"]
-    for name, val in collected["path"].items():
-        path = path.replace(f"{{{name}}}", val)
-    url = base_url + path
+    url = base_url + fill_path(ep.path, collected["path"])
     if collected["query"]:
         url += "?" + urlencode(collected["query"])
 
@@ -758,22 +1335,23 @@ def main():
     headers.update(collected["header"])
 
     body = collected["body"]
+    body_json = _json_dumps(body) if body is not None else None
 
     # Print curl command
-    curl_cmd = build_curl(ep["method"], url, headers, body)
+    curl_cmd = build_curl(ep.method, url, headers, body, body_json=body_json)
     print(f"\n\033[2m$ {curl_cmd}\033[0m")
     if body is not None:
-        print(highlight_json(json.dumps(body, indent=2)))
+        print(highlight_json(_json_dumps(body, indent=True)))
 
     if args.dry_run:
         return
 
     # Execute request
     try:
-        status_code = execute_request(ep["method"], url, headers, body)
-        _save_to_history(ep["method"], url, headers, body, args.spec, ep["summary"], status_code)
+        status_code = execute_request(ep.method, url, headers, body)
+        _save_to_history(ep.method, url, headers, body, args.spec, ep.summary, status_code)
     except httpx.HTTPError as e:
-        _save_to_history(ep["method"], url, headers, body, args.spec, ep["summary"], None)
+        _save_to_history(ep.method, url, headers, body, args.spec, ep.summary, None)
         print(f"\n\033[31mRequest failed: {e}\033[0m", file=sys.stderr)
         sys.exit(1)
 
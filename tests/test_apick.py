@@ -1,8 +1,12 @@
 """Tests for apick — pure functions only (no fzf/stdin needed)."""
 
 import json
+import os
+import shlex
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 import apick
 
 # ---------------------------------------------------------------------------
@@ -29,6 +33,49 @@ class TestResolveRef:
         result = apick.resolve_ref(spec, "#/components/schemas/Pet")
         assert "$ref" in result
 
+    def test_first_segment_starting_with_hash(self):
+        # lstrip("#/") would eat into a first segment made of those chars
+        spec = {"#meta": {"Pet": {"type": "object"}}}
+        result = apick.resolve_ref(spec, "#/#meta/Pet")
+        assert result == {"type": "object"}
+
+    def test_active_spec_components_are_preindexed(self):
+        spec = {
+            "components": {
+                "schemas": {"Pet": {"type": "object"}},
+                "parameters": {"limit": {"name": "limit", "in": "query"}},
+            }
+        }
+        apick._set_active_spec(spec)
+        try:
+            pet = spec["components"]["schemas"]["Pet"]
+            assert apick._ref_cache["#/components/schemas/Pet"] is pet
+            assert "#/components/parameters/limit" in apick._ref_cache
+        finally:
+            apick._set_active_spec({})
+
+    def test_json_pointer_escapes(self):
+        # RFC 6901: ~1 encodes '/' and ~0 encodes '~' inside a segment
+        spec = {"paths": {"/pets/{id}": {"get": {"type": "object"}}}}
+        result = apick.resolve_ref(spec, "#/paths/~1pets~1{id}/get")
+        assert result == {"type": "object"}
+
+    def test_caches_refs_for_active_spec(self):
+        spec = {"components": {"schemas": {"Pet": {"type": "object"}}}}
+        apick._set_active_spec(spec)
+        try:
+            first = apick.resolve_ref(spec, "#/components/schemas/Pet")
+            assert "#/components/schemas/Pet" in apick._ref_cache
+            second = apick.resolve_ref(spec, "#/components/schemas/Pet")
+            assert first is second
+        finally:
+            apick._set_active_spec({})
+
+    def test_no_caching_for_inactive_spec(self):
+        spec = {"components": {"schemas": {"Pet": {"type": "object"}}}}
+        apick.resolve_ref(spec, "#/components/schemas/Pet")
+        assert apick._ref_cache == {}
+
 
 class TestResolveSchema:
     def test_resolves_ref(self):
@@ -71,6 +118,112 @@ class TestResolveSchema:
         assert apick.resolve_schema({}, "string") == "string"
         assert apick.resolve_schema({}, 42) == 42
 
+    def test_recursive_ref_terminates(self):
+        spec = {
+            "components": {
+                "schemas": {
+                    "Node": {
+                        "type": "object",
+                        "properties": {
+                            "value": {"type": "string"},
+                            "next": {"$ref": "#/components/schemas/Node"},
+                        },
+                    }
+                }
+            }
+        }
+        result = apick.resolve_schema(spec, {"$ref": "#/components/schemas/Node"})
+        assert result["type"] == "object"
+        assert result["properties"]["value"] == {"type": "string"}
+        # The self-reference is cut rather than recursing forever
+        assert result["properties"]["next"] == {}
+
+    def test_in_memory_cycle_terminates(self):
+        # A YAML alias can close a cycle with no $ref anywhere on the path
+        schema: dict = {"type": "object", "properties": {}}
+        schema["properties"]["self"] = schema
+        result = apick.resolve_schema({}, schema)
+        assert result["type"] == "object"
+        assert result["properties"]["self"] == {}
+
+    def test_deeply_nested_schema_no_recursion_error(self):
+        schema = {"type": "string"}
+        for _ in range(2000):
+            schema = {"type": "object", "properties": {"child": schema}}
+        result = apick.resolve_schema({}, schema)
+        assert result["type"] == "object"
+
+    def test_cached_wrapper_memoizes_refs_for_active_spec(self):
+        spec = {"components": {"schemas": {"Pet": {"type": "object"}}}}
+        schema = {"$ref": "#/components/schemas/Pet"}
+        apick._set_active_spec(spec)
+        try:
+            first = apick._resolve_schema_cached(spec, schema)
+            second = apick._resolve_schema_cached(spec, {"$ref": "#/components/schemas/Pet"})
+            assert first is second
+        finally:
+            apick._set_active_spec({})
+
+
+class TestPreresolveSpec:
+    def test_inlines_rarely_used_ref(self):
+        spec = {
+            "components": {"schemas": {"Pet": {"type": "object"}}},
+            "paths": {"/pets": {"get": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+        }
+        apick.preresolve_spec(spec)
+        assert spec["paths"]["/pets"]["get"]["schema"] == {"type": "object"}
+
+    def test_inlined_copy_is_independent(self):
+        spec = {
+            "components": {"schemas": {"Pet": {"type": "object"}}},
+            "paths": {"/pets": {"get": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+        }
+        apick.preresolve_spec(spec)
+        spec["paths"]["/pets"]["get"]["schema"]["mutated"] = True
+        assert "mutated" not in spec["components"]["schemas"]["Pet"]
+
+    def test_keeps_heavily_used_refs(self):
+        ref = {"$ref": "#/components/schemas/Pet"}
+        spec = {
+            "components": {"schemas": {"Pet": {"type": "object"}}},
+            "paths": {f"/p{i}": {"get": {"schema": dict(ref)}} for i in range(6)},
+        }
+        apick.preresolve_spec(spec)
+        assert spec["paths"]["/p0"]["get"]["schema"] == ref
+
+    def test_keeps_recursive_refs(self):
+        spec = {
+            "components": {
+                "schemas": {
+                    "Node": {
+                        "type": "object",
+                        "properties": {"next": {"$ref": "#/components/schemas/Node"}},
+                    }
+                }
+            },
+            "paths": {"/n": {"get": {"schema": {"$ref": "#/components/schemas/Node"}}}},
+        }
+        apick.preresolve_spec(spec)
+        assert spec["paths"]["/n"]["get"]["schema"] == {"$ref": "#/components/schemas/Node"}
+
+    def test_yaml_alias_cycle_terminates(self):
+        # yaml.safe_load("a: &x\n  b: *x\n") builds a self-containing dict;
+        # both the site walk and the component-graph DFS must not spin on it
+        looped: dict = {"type": "object"}
+        looped["self"] = looped
+        spec = {
+            "components": {"schemas": {"Weird": looped}},
+            "paths": {"/w": {"get": {"schema": {"$ref": "#/components/schemas/Weird"}}}},
+        }
+        apick.preresolve_spec(spec)
+        assert spec["paths"]["/w"]["get"]["schema"]["type"] == "object"
+
+    def test_dangling_ref_left_alone(self):
+        spec = {"paths": {"/x": {"get": {"schema": {"$ref": "#/components/schemas/Gone"}}}}}
+        apick.preresolve_spec(spec)
+        assert spec["paths"]["/x"]["get"]["schema"] == {"$ref": "#/components/schemas/Gone"}
+
 
 # ---------------------------------------------------------------------------
 # extract_endpoints
@@ -131,6 +284,22 @@ class TestExtractEndpoints:
         eps = apick.extract_endpoints(spec)
         assert eps[0]["parameters"][0]["name"] == "limit"
 
+    def test_operation_param_overrides_path_param(self):
+        spec = {
+            "paths": {
+                "/pets": {
+                    "parameters": [{"name": "limit", "in": "query", "description": "path-level"}],
+                    "get": {
+                        "parameters": [{"name": "limit", "in": "query", "description": "op-level"}]
+                    },
+                }
+            }
+        }
+        eps = apick.extract_endpoints(spec)
+        params = eps[0]["parameters"]
+        assert len(params) == 1
+        assert params[0]["description"] == "op-level"
+
     def test_empty_paths(self):
         assert apick.extract_endpoints({"paths": {}}) == []
         assert apick.extract_endpoints({}) == []
@@ -207,6 +376,19 @@ class TestFormatSchemaTree:
         tree = apick.format_schema_tree({"type": "string"})
         assert "string" in tree
 
+    def test_deeply_nested_does_not_recurse(self):
+        schema = {"type": "string"}
+        for _ in range(2000):
+            schema = {"type": "object", "properties": {"child": schema}}
+        tree = apick.format_schema_tree(schema)
+        assert "child" in tree
+
+    def test_self_referential_schema_renders_marker(self):
+        schema: dict = {"type": "object", "properties": {}}
+        schema["properties"]["self"] = schema
+        tree = apick.format_schema_tree(schema)
+        assert "<recursive>" in tree
+
 
 # ---------------------------------------------------------------------------
 # generate_template
@@ -251,6 +433,49 @@ class TestGenerateTemplate:
     def test_number_default(self):
         assert apick.generate_template({"type": "number"}) == 0.0
 
+    def test_preserves_property_order(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "first": {"type": "string"},
+                "second": {"type": "integer"},
+                "third": {"type": "boolean"},
+            },
+        }
+        result = apick.generate_template(schema)
+        assert list(result) == ["first", "second", "third"]
+
+    def test_deeply_nested_does_not_recurse(self):
+        schema = {"type": "string"}
+        for _ in range(2000):
+            schema = {"type": "object", "properties": {"child": schema}}
+        result = apick.generate_template(schema)
+        assert isinstance(result, dict)
+
+    def test_self_referential_schema_stops(self):
+        schema: dict = {"type": "object", "properties": {}}
+        schema["properties"]["self"] = schema
+        result = apick.generate_template(schema)
+        assert result == {"self": {}}
+
+
+# ---------------------------------------------------------------------------
+# fill_path
+# ---------------------------------------------------------------------------
+
+
+class TestFillPath:
+    def test_substitutes_multiple_params(self):
+        result = apick.fill_path("/users/{user}/pets/{pet}", {"user": "1", "pet": "2"})
+        assert result == "/users/1/pets/2"
+
+    def test_url_encodes_values(self):
+        result = apick.fill_path("/users/{name}", {"name": "foo bar/baz"})
+        assert result == "/users/foo%20bar%2Fbaz"
+
+    def test_leaves_unknown_params(self):
+        assert apick.fill_path("/users/{id}", {}) == "/users/{id}"
+
 
 # ---------------------------------------------------------------------------
 # get_base_url
@@ -263,6 +488,12 @@ class TestGetBaseUrl:
         result = apick.get_base_url(spec, "spec.yaml", override="https://override.com/")
         assert result == "https://override.com"
 
+    def test_override_ignores_malformed_server_entry(self):
+        # A server entry without "url" must not be touched when overriding
+        spec = {"servers": [{"description": "broken"}]}
+        result = apick.get_base_url(spec, "spec.yaml", override="https://override.com")
+        assert result == "https://override.com"
+
     def test_absolute_server_url(self):
         spec = {"servers": [{"url": "https://api.example.com/v1"}]}
         result = apick.get_base_url(spec, "spec.yaml")
@@ -315,6 +546,21 @@ class TestBuildCurl:
         )
         assert "'Authorization: Bearer secret'" in cmd
 
+    def test_body_with_single_quote_is_shell_safe(self):
+        cmd = apick.build_curl("POST", "https://api.example.com/pets", {}, body={"name": "O'Brien"})
+        tokens = shlex.split(cmd)
+        assert any(token.startswith("{") and "O'Brien" in token for token in tokens)
+
+    def test_preserialized_body_used_verbatim(self):
+        cmd = apick.build_curl(
+            "POST",
+            "https://api.example.com/pets",
+            {},
+            body={"name": "Fido"},
+            body_json='{"name": "Fido"}',
+        )
+        assert '{"name": "Fido"}' in cmd
+
 
 # ---------------------------------------------------------------------------
 # fetch_spec (with mocking)
@@ -335,38 +581,180 @@ class TestFetchSpec:
         result = apick.fetch_spec(str(p))
         assert result["openapi"] == "3.0.0"
 
-    def test_load_from_url(self):
+    def test_load_json_with_leading_whitespace(self, tmp_path):
+        p = tmp_path / "spec.json"
+        p.write_text('\n  {"openapi": "3.0.0", "paths": {}}')
+        result = apick.fetch_spec(str(p))
+        assert result["openapi"] == "3.0.0"
+
+    def test_yaml_flow_mapping_still_parses(self, tmp_path):
+        # Starts with '{' like JSON but only parses as YAML
+        p = tmp_path / "spec.yaml"
+        p.write_text("{openapi: 3.0.0, paths: {}}\n")
+        result = apick.fetch_spec(str(p))
+        assert result["openapi"] == "3.0.0"
+
+    def test_load_from_url(self, tmp_path):
         spec_data = {"openapi": "3.0.0", "paths": {}}
         mock_resp = MagicMock()
-        mock_resp.text = json.dumps(spec_data)
+        mock_resp.content = json.dumps(spec_data).encode()
+        mock_resp.status_code = 200
+        mock_resp.headers = {}
         mock_resp.raise_for_status = MagicMock()
 
-        with patch("apick.httpx.get", return_value=mock_resp) as mock_get:
+        mock_client = MagicMock()
+        mock_client.get.return_value = mock_resp
+        with (
+            patch("apick.CACHE_DIR", str(tmp_path / "cache")),
+            patch("apick._client", return_value=mock_client),
+        ):
             result = apick.fetch_spec("https://example.com/spec.json")
-            mock_get.assert_called_once_with("https://example.com/spec.json", timeout=30)
+            mock_client.get.assert_called_once_with("https://example.com/spec.json", headers={})
             assert result == spec_data
 
 
+class TestCachedFetch:
+    URL = "https://example.com/spec.json"
+
+    @staticmethod
+    def _response(status_code=200, content=b"", headers=None):
+        resp = MagicMock()
+        resp.status_code = status_code
+        resp.content = content
+        resp.headers = headers or {}
+        return resp
+
+    @staticmethod
+    def _mock_client(*responses):
+        client = MagicMock()
+        client.get.side_effect = list(responses)
+        return client
+
+    def test_writes_cache_when_validators_present(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        client = self._mock_client(self._response(content=b'{"a": 1}', headers={"etag": 'W/"abc"'}))
+        with (
+            patch("apick.CACHE_DIR", cache_dir),
+            patch("apick._client", return_value=client),
+        ):
+            assert apick._cached_fetch(self.URL) == b'{"a": 1}'
+        cached = list((tmp_path / "cache").iterdir())
+        assert len(cached) == 2  # body + meta
+
+    def test_no_cache_without_validators(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        client = self._mock_client(self._response(content=b'{"a": 1}'))
+        with (
+            patch("apick.CACHE_DIR", cache_dir),
+            patch("apick._client", return_value=client),
+        ):
+            assert apick._cached_fetch(self.URL) == b'{"a": 1}'
+        assert not (tmp_path / "cache").exists()
+
+    def test_304_returns_cached_body(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        client = self._mock_client(
+            self._response(content=b'{"a": 1}', headers={"etag": 'W/"abc"'}),
+            self._response(status_code=304),
+        )
+        with (
+            patch("apick.CACHE_DIR", cache_dir),
+            patch("apick._client", return_value=client),
+        ):
+            apick._cached_fetch(self.URL)
+            assert apick._cached_fetch(self.URL) == b'{"a": 1}'
+        # Second request carried the conditional header
+        sent_headers = client.get.call_args.kwargs["headers"]
+        assert sent_headers["If-None-Match"] == 'W/"abc"'
+
+
+# ---------------------------------------------------------------------------
+# JSON helpers
+# ---------------------------------------------------------------------------
+
+
+class TestJsonHelpers:
+    def test_roundtrip(self):
+        data = {"name": "Fido", "tags": ["a", "b"], "age": 3, "ok": True, "extra": None}
+        assert apick._json_loads(apick._json_dumps(data)) == data
+
+    def test_indent(self):
+        assert apick._json_dumps({"key": "value"}, indent=True) == '{\n  "key": "value"\n}'
+
+    def test_compact_by_default(self):
+        assert apick._json_dumps({"a": 1, "b": 2}) == '{"a":1,"b":2}'
+
+
 # ---------------------------------------------------------------------------
 # highlight_json (with mocking)
 # ---------------------------------------------------------------------------
 
 
 class TestHighlightJson:
-    def test_jq_available(self):
+    def test_jq_used_when_opted_in(self):
         mock_result = MagicMock()
         mock_result.returncode = 0
         mock_result.stdout = '{\n  "key": "value"\n}\n'
 
-        with patch("apick.subprocess.run", return_value=mock_result):
+        with (
+            patch.dict(os.environ, {"APICK_USE_JQ": "1"}),
+            patch("apick._have_jq", return_value=True),
+            patch("apick.subprocess.run", return_value=mock_result),
+        ):
             result = apick.highlight_json('{"key": "value"}')
             assert result == mock_result.stdout
 
-    def test_jq_not_found(self):
-        with patch("apick.subprocess.run", side_effect=FileNotFoundError):
+    def test_jq_not_used_without_opt_in(self):
+        os.environ.pop("APICK_USE_JQ", None)
+        with (
+            patch("apick._have_jq", return_value=True),
+            patch("apick.subprocess.run") as mock_run,
+            patch("apick._pygments_highlight", return_value="colored"),
+        ):
+            assert apick.highlight_json('{"key": "value"}') == "colored"
+            mock_run.assert_not_called()
+
+    def test_no_pygments_returns_plain(self):
+        os.environ.pop("APICK_USE_JQ", None)
+        with patch("apick._pygments_highlight", return_value=None):
             result = apick.highlight_json('{"key": "value"}')
             assert result == '{"key": "value"}'
 
+    def test_pygments_primary_path(self):
+        pytest.importorskip("pygments")
+        os.environ.pop("APICK_USE_JQ", None)
+        result = apick.highlight_json('{"key": "value"}')
+        assert "key" in result
+        assert "\033[" in result
+
+
+# ---------------------------------------------------------------------------
+# Preview files
+# ---------------------------------------------------------------------------
+
+
+class TestPreviewFiles:
+    def test_roundtrip(self, capsys):
+        details = ["first block", "second\nblock", "GET /pets — détails"]
+        blob, idx = apick._write_preview_files(details)
+        try:
+            apick.handle_preview("1", blob, idx)
+            assert capsys.readouterr().out == "second\nblock\n"
+            apick.handle_preview("2", blob, idx)
+            assert capsys.readouterr().out == "GET /pets — détails\n"
+        finally:
+            os.unlink(blob)
+            os.unlink(idx)
+
+    def test_out_of_range_prints_nothing(self, capsys):
+        blob, idx = apick._write_preview_files(["only"])
+        try:
+            apick.handle_preview("5", blob, idx)
+            assert capsys.readouterr().out == ""
+        finally:
+            os.unlink(blob)
+            os.unlink(idx)
+
 
 # ---------------------------------------------------------------------------
 # History
@@ -384,14 +772,14 @@ class TestHistory:
         with patch("apick.HISTORY_FILE", str(p)):
             assert apick.load_history() == []
 
-    def test_load_non_list_json(self, tmp_path):
-        p = tmp_path / "history.json"
-        p.write_text('{"key": "value"}')
+    def test_load_non_dict_lines(self, tmp_path):
+        p = tmp_path / "history.jsonl"
+        p.write_text("[1, 2, 3]\n")
         with patch("apick.HISTORY_FILE", str(p)):
             assert apick.load_history() == []
 
     def test_save_and_load_roundtrip(self, tmp_path):
-        hfile = str(tmp_path / ".apick" / "history.json")
+        hfile = str(tmp_path / ".apick" / "history.jsonl")
         entries = [
             {"method": "GET", "url": "https://example.com/pets", "status_code": 200},
             {"method": "POST", "url": "https://example.com/pets", "status_code": 201},
@@ -402,7 +790,7 @@ class TestHistory:
         assert loaded == entries
 
     def test_truncation_to_max_history(self, tmp_path):
-        hfile = str(tmp_path / ".apick" / "history.json")
+        hfile = str(tmp_path / ".apick" / "history.jsonl")
         entries = [{"method": "GET", "url": f"https://example.com/{i}"} for i in range(600)]
         with patch("apick.HISTORY_FILE", hfile):
             apick.save_history(entries)
@@ -412,6 +800,46 @@ class TestHistory:
         assert loaded[0]["url"] == "https://example.com/100"
         assert loaded[-1]["url"] == "https://example.com/599"
 
+    def test_append_is_incremental(self, tmp_path):
+        hfile = str(tmp_path / ".apick" / "history.jsonl")
+        with patch("apick.HISTORY_FILE", hfile):
+            apick.append_history({"method": "GET", "url": "https://example.com/1"})
+            apick.append_history({"method": "GET", "url": "https://example.com/2"})
+            loaded = apick.load_history()
+        assert [e["url"] for e in loaded] == ["https://example.com/1", "https://example.com/2"]
+
+    def test_legacy_json_array_is_migrated(self, tmp_path):
+        hdir = tmp_path / ".apick"
+        hdir.mkdir()
+        entries = [{"method": "GET", "url": "https://example.com/pets"}]
+        (hdir / "history.json").write_text(json.dumps(entries))
+        with patch("apick.HISTORY_FILE", str(hdir / "history.jsonl")):
+            loaded = apick.load_history()
+        assert loaded == entries
+        assert not (hdir / "history.json").exists()
+        assert (hdir / "history.jsonl").exists()
+
+    def test_append_compacts_oversized_file(self, tmp_path):
+        hfile = str(tmp_path / ".apick" / "history.jsonl")
+        entries = [
+            {"method": "GET", "url": f"https://example.com/{i}"}
+            for i in range(apick.MAX_HISTORY + 100)
+        ]
+        with patch("apick.HISTORY_FILE", hfile):
+            apick.save_history(entries)  # save_history already truncates to 500
+            # Grow the file past the compaction threshold line by line
+            with open(hfile, "a") as f:
+                f.writelines(
+                    json.dumps({"method": "GET", "url": f"https://example.com/x{i}"}) + "\n"
+                    for i in range(101)
+                )
+            apick.append_history({"method": "GET", "url": "https://example.com/last"})
+            loaded = apick.load_history()
+        assert len(loaded) == apick.MAX_HISTORY
+        assert loaded[-1]["url"] == "https://example.com/last"
+        # The atomic rewrite leaves no temp file behind
+        assert os.listdir(tmp_path / ".apick") == ["history.jsonl"]
+
     def test_format_history_newest_first(self):
         entries = [
             {
@@ -472,6 +900,21 @@ class TestHistory:
         assert loaded[0]["headers"]["Accept"] == "application/json"
         assert loaded[0]["status_code"] == 200
 
+    def test_save_to_history_strips_all_credential_headers(self, tmp_path):
+        hfile = str(tmp_path / ".apick" / "history.json")
+        headers = {
+            "Cookie": "session=abc",
+            "X-API-Key": "key123",
+            "Proxy-Authorization": "Basic xyz",
+            "Accept": "application/json",
+        }
+        with patch("apick.HISTORY_FILE", hfile):
+            apick._save_to_history(
+                "GET", "https://example.com/pets", headers, None, "spec.yaml", "List pets", 200
+            )
+            loaded = apick.load_history()
+        assert loaded[0]["headers"] == {"Accept": "application/json"}
+
 
 # ---------------------------------------------------------------------------
 # execute_request
@@ -486,7 +929,9 @@ class TestExecuteRequest:
         mock_resp.json.side_effect = ValueError("not json")
         mock_resp.text = "ok"
 
-        with patch("apick.httpx.request", return_value=mock_resp):
+        mock_client = MagicMock()
+        mock_client.request.return_value = mock_resp
+        with patch("apick._client", return_value=mock_client):
             result = apick.execute_request("GET", "https://example.com", {})
         assert result == 200
 
@@ -496,8 +941,10 @@ class TestExecuteRequest:
         mock_resp.reason_phrase = "OK"
         mock_resp.json.return_value = {"key": "value"}
 
+        mock_client = MagicMock()
+        mock_client.request.return_value = mock_resp
         with (
-            patch("apick.httpx.request", return_value=mock_resp),
+            patch("apick._client", return_value=mock_client),
             patch("apick.highlight_json", return_value='{\n  "key": "value"\n}') as mock_hl,
         ):
             result = apick.execute_request("GET", "https://example.com", {})
@@ -511,6 +958,8 @@ class TestExecuteRequest:
         mock_resp.json.side_effect = ValueError("not json")
         mock_resp.text = "plain text body"
 
-        with patch("apick.httpx.request", return_value=mock_resp):
+        mock_client = MagicMock()
+        mock_client.request.return_value = mock_resp
+        with patch("apick._client", return_value=mock_client):
             apick.execute_request("GET", "https://example.com", {})
         assert "plain text body" in capsys.readouterr().out